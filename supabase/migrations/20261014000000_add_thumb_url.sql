@@ -0,0 +1,2 @@
+-- Small Discogs thumbnail shown in the collection grid; CoverURL stays the full-size image.
+alter table "Inventory" add column if not exists "ThumbURL" text;
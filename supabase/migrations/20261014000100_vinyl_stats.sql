@@ -0,0 +1,11 @@
+-- Collection metrics for the top panel, aggregated in one round-trip.
+create or replace function vinyl_stats()
+returns table (total_vinyls bigint, favorite_genre text, total_minutes bigint)
+language sql
+stable
+as $$
+    select
+        (select count(*) from "Inventory"),
+        (select mode() within group (order by "Genre") from "Inventory"),
+        (select coalesce(sum("DurationMins"::numeric), 0)::bigint from "ListeningHistory");
+$$;
@@ -0,0 +1,8 @@
+-- Inventory IDs used to be int(time.time()), which collides when two vinyls are saved in the same second.
+-- New rows get a database-generated UUID; CreatedAt keeps the newest-first gallery order.
+alter table "Inventory" add column if not exists "CreatedAt" timestamptz not null default now();
+update "Inventory" set "CreatedAt" = to_timestamp("ID"::bigint);
+
+alter table "Inventory" alter column "ID" drop identity if exists;
+alter table "Inventory" alter column "ID" type text using "ID"::text;
+alter table "Inventory" alter column "ID" set default gen_random_uuid()::text;
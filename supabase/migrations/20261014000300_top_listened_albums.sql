@@ -0,0 +1,12 @@
+-- Per-album listening totals for the dashboard, so the client never downloads the full history table.
+create or replace function top_listened_albums(limit_count int default 5)
+returns table ("AlbumName" text, "DurationMins" bigint)
+language sql
+stable
+as $$
+    select "AlbumName", coalesce(sum("DurationMins"::numeric), 0)::bigint
+    from "ListeningHistory"
+    group by "AlbumName"
+    order by 2 desc
+    limit limit_count;
+$$;
@@ -1,12 +1,16 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import requests
 import time
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 import json
 import base64
 from supabase import create_client, Client
 import re
+import html
+from concurrent.futures import ThreadPoolExecutor
 
 # --- NEW IMPORTS FOR BARCODE SCANNER ---
 try:
@@ -18,6 +22,15 @@ except ImportError:
 # --- GLOBAL UI SETTINGS ---
 gridImageWidth = 150
 listImageWidth = 250
+galleryPageSize = 12
+defaultCoverUrl = "https://upload.wikimedia.org/wikipedia/commons/b/b6/12in-Vinyl-LP-Record-Angle.jpg"
+
+# --- WRITE SETTINGS ---
+pendingWriteLimit = 3
+pendingWriteMaxAge = 45
+
+# --- DISCOGS SETTINGS ---
+prefetchCount = 5
 
 # --- PAGE CONFIGURATION ---
 st.set_page_config(page_title="Vinyl Collection", page_icon="🎵", layout="wide")
@@ -29,10 +42,38 @@ st.markdown("""
     div[data-testid="stMetricValue"] {color: #1DB954; font-size: 28px;}
     .stButton>button {width: 100%; border-radius: 20px;}
     .tracklist-text {font-size: 14px; color: #A0A0A0; margin-bottom: 2px;}
+    .vinyl-grid {display: grid; grid-template-columns: repeat(3, 1fr); gap: 1rem; margin-bottom: 1rem;}
+    .vinyl-card h4 {margin: 8px 0 2px 0; padding: 0;}
+    .vinyl-card p {margin: 0 0 2px 0;}
+    .vinyl-card .vinyl-artist {font-size: 14px; color: #A0A0A0;}
 </style>
 """, unsafe_allow_html=True)
 
 
+# --- HTML HELPERS ---
+def lazyImg(url, width):
+    if not url or not str(url).startswith("http"):
+        url = defaultCoverUrl
+    safeUrl = html.escape(str(url), quote=True)
+    return f'<img src="{safeUrl}" loading="lazy" decoding="async" width="{width}" style="border-radius:8px">'
+
+
+def buildCardHtml(row):
+    thumbUrl = row.get("ThumbURL", "")
+    gridCoverUrl = thumbUrl if pd.notna(thumbUrl) and thumbUrl else row.get("CoverURL", "")
+
+    displayDuration = row.get("DurationMins", 0)
+    durationStr = f" | ⏱️ {displayDuration} mins" if displayDuration else ""
+
+    subGenreStr = f" ({row.get('SubGenre', '')})" if pd.notna(row.get('SubGenre')) and row.get('SubGenre') else ""
+
+    detailsStr = html.escape(f"📅 {row['Year']} | 🏷️ {row['Genre']}{subGenreStr}{durationStr}")
+    return (f"<div class='vinyl-card'>{lazyImg(gridCoverUrl, gridImageWidth)}"
+            f"<h4>{html.escape(str(row['AlbumName']))}</h4>"
+            f"<p class='vinyl-artist'>🎤 {html.escape(str(row['Artist']))}</p>"
+            f"<p>{detailsStr}</p></div>")
+
+
 # --- CONFIGURATION & TOKENS ---
 def getSecretsData(keyName):
     try:
@@ -102,13 +143,28 @@ def fetchSpotifyData(artistName, albumName):
 
 
 # --- DISCOGS API ---
+@st.cache_resource
+def initDiscogsSession():
+    # Shared across reruns so consecutive Discogs calls reuse the open TLS connection.
+    session = requests.Session()
+    session.headers.update({"User-Agent": "VinylCollectionApp/3.0"})
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+    return session
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetchDiscogsJson(apiUrl):
+    # Failed requests raise instead of returning, so errors are never cached.
+    apiResponse = initDiscogsSession().get(apiUrl, timeout=10)
+    apiResponse.raise_for_status()
+    return apiResponse.json()
+
+
 def searchDiscogsApi(searchQuery=None, barcodeQuery=None):
     apiToken = getSecretsData("discogs_token")
     if not apiToken:
         return []
 
-    headersInfo = {"User-Agent": "VinylCollectionApp/3.0"}
-
     try:
         if barcodeQuery:
             apiUrl = f"https://api.discogs.com/database/search?barcode={barcodeQuery}&type=release&token={apiToken}"
@@ -117,42 +173,38 @@ def searchDiscogsApi(searchQuery=None, barcodeQuery=None):
         else:
             return []
 
-        apiResponse = requests.get(apiUrl, headers=headersInfo)
-        apiResponse.raise_for_status()
-        responseData = apiResponse.json()
+        responseData = fetchDiscogsJson(apiUrl)
         return responseData.get("results", [])[:10]
     except Exception as e:
         st.error(f"API Connection Error: {e}")
         return []
 
 
+def sumTrackSeconds(durationValues):
+    durationArray = np.char.strip(np.array(durationValues, dtype=str))
+    if durationArray.size == 0:
+        return 0
+
+    # Only plain "MM:SS" values count; blanks and "H:MM:SS" entries are skipped.
+    durationParts = np.char.partition(durationArray, ":")
+    minutesArray, secondsArray = durationParts[:, 0], durationParts[:, 2]
+    validMask = np.char.isdecimal(minutesArray) & np.char.isdecimal(secondsArray)
+    return int((minutesArray[validMask].astype(int) * 60 + secondsArray[validMask].astype(int)).sum())
+
+
 def fetchReleaseDetails(releaseId):
     apiToken = getSecretsData("discogs_token")
     if not apiToken:
         return 0, "", ""
 
     apiUrl = f"https://api.discogs.com/releases/{releaseId}?token={apiToken}"
-    headersInfo = {"User-Agent": "VinylCollectionApp/3.0"}
 
     try:
-        apiResponse = requests.get(apiUrl, headers=headersInfo)
-        apiResponse.raise_for_status()
-        responseData = apiResponse.json()
-
-        totalSeconds = 0
-        trackNames = []
-        for track in responseData.get("tracklist", []):
-            trackTitle = track.get("title", "")
-            if trackTitle:
-                trackNames.append(trackTitle)
-
-            durationStr = track.get("duration", "")
-            if durationStr and ":" in durationStr:
-                try:
-                    minutes, seconds = durationStr.split(":", 1)
-                    totalSeconds += int(minutes) * 60 + int(seconds)
-                except ValueError:
-                    pass
+        responseData = fetchDiscogsJson(apiUrl)
+
+        tracklistData = responseData.get("tracklist", [])
+        trackNames = [track.get("title", "") for track in tracklistData if track.get("title")]
+        totalSeconds = sumTrackSeconds([str(track.get("duration") or "") for track in tracklistData])
 
         tracklistString = " | ".join(trackNames)
 
@@ -164,6 +216,55 @@ def fetchReleaseDetails(releaseId):
         return 0, "", ""
 
 
+# --- RELEASE DETAILS PREFETCH ---
+@st.cache_resource
+def initPrefetchExecutor():
+    return ThreadPoolExecutor(max_workers=4)
+
+
+def loadReleaseDetails(releaseId, releaseTitle, discogsFuture=None):
+    if " - " in releaseTitle:
+        tempArtist, tempAlbum = releaseTitle.split(" - ", 1)
+    else:
+        tempArtist, tempAlbum = "Unknown", releaseTitle
+
+    # Spotify is only queried for the selected result; the prefetched Discogs call finishes alongside it.
+    spotifyCover, spotifyDur = fetchSpotifyData(tempArtist, tempAlbum)
+    if discogsFuture is not None and not discogsFuture.cancelled():
+        discogsDur, fetchedTracklist, fetchedSubGenre = discogsFuture.result()
+    else:
+        discogsDur, fetchedTracklist, fetchedSubGenre = fetchReleaseDetails(releaseId)
+    finalDur = spotifyDur if spotifyDur > 0 else discogsDur
+
+    return {
+        "tracklist": fetchedTracklist,
+        "duration": finalDur,
+        "spotifyCover": spotifyCover,
+        "subGenre": fetchedSubGenre
+    }
+
+
+def prefetchReleaseDetails(apiResults):
+    # Discogs details for the top hits load in the background while the user is still reading the result list.
+    executor = initPrefetchExecutor()
+    topResults = apiResults[:prefetchCount]
+
+    # A new result list replaces the old futures; the barcode flow re-runs the same search and keeps them.
+    resultIds = tuple(item.get("id") for item in topResults)
+    if st.session_state.get("detailFutureIds") != resultIds:
+        for staleFuture in st.session_state.get("detailFutures", {}).values():
+            staleFuture.cancel()
+        st.session_state["detailFutures"] = {}
+        st.session_state["detailFutureIds"] = resultIds
+
+    detailFutures = st.session_state["detailFutures"]
+    for item in topResults:
+        releaseId = item.get("id")
+        if releaseId is None or releaseId in detailFutures or f"details_{releaseId}" in st.session_state:
+            continue
+        detailFutures[releaseId] = executor.submit(fetchReleaseDetails, releaseId)
+
+
 # --- SUPABASE DATABASE ---
 @st.cache_resource
 def initSupabase() -> Client:
@@ -177,98 +278,275 @@ def initSupabase() -> Client:
         st.stop()
 
 
+def buildFrame(tableName, rows):
+    df = pd.DataFrame(rows)
+
+    if df.empty:
+        if tableName == "Inventory":
+            df = pd.DataFrame(
+                columns=["ID", "CreatedAt", "Artist", "AlbumName", "Genre", "SubGenre", "Year", "CoverURL",
+                         "ThumbURL", "Condition", "DurationMins", "Tracklist"])
+        elif tableName == "ListeningHistory":
+            df = pd.DataFrame(columns=["id", "Date", "AlbumName", "DurationMins"])
+
+    if tableName == "Inventory":
+        # Normalized once per fetch so duplicate checks are a single vectorized comparison.
+        df["_matchKey"] = (df["Artist"].fillna("").astype(str).str.strip().str.lower() + "\x1f" +
+                           df["AlbumName"].fillna("").astype(str).str.strip().str.lower())
+
+        for colName in ("Genre", "Condition", "Artist"):
+            df[colName] = df[colName].astype("category")
+        df["DurationMins"] = pd.to_numeric(df["DurationMins"], errors='coerce').fillna(0).round().astype(
+            pd.Int32Dtype())
+
+        # Changes only when the table is actually re-queried, so getFacets can key on it instead of the frame.
+        df.attrs["fetchedAt"] = datetime.now().timestamp()
+    return df
+
+
+def buildSearchFilter(searchQuery):
+    # Quoted values keep commas and parentheses in the search term from breaking the PostgREST or= syntax.
+    safeQuery = searchQuery.replace("\\", "\\\\").replace('"', '\\"')
+    return f'AlbumName.ilike."*{safeQuery}*",Artist.ilike."*{safeQuery}*"'
+
+
+def getErrorCode(error):
+    return getattr(error, "code", None)
+
+
+def queryTable(supabase, tableName, genres, search, offset, limit, orderColumn):
+    query = supabase.table(tableName).select("*")
+    if genres:
+        query = query.in_("Genre", list(genres))
+    if search:
+        query = query.or_(buildSearchFilter(search))
+    if limit:
+        query = query.order(orderColumn, desc=True)
+        if orderColumn != "ID":
+            # Rows sharing a CreatedAt value would otherwise shuffle between pages.
+            query = query.order("ID", desc=True)
+        query = query.range(offset, offset + limit - 1)
+    return query.execute()
+
+
 @st.cache_data(ttl=600)
-def fetchData(tableName):
+def fetchData(tableName, genres=None, search=None, offset=0, limit=None):
     try:
         supabase = initSupabase()
-        response = supabase.table(tableName).select("*").execute()
-        df = pd.DataFrame(response.data)
-
-        if df.empty:
-            if tableName == "Inventory":
-                df = pd.DataFrame(
-                    columns=["ID", "Artist", "AlbumName", "Genre", "SubGenre", "Year", "CoverURL", "Condition",
-                             "DurationMins", "Tracklist"])
-            elif tableName == "ListeningHistory":
-                df = pd.DataFrame(columns=["id", "Date", "AlbumName", "DurationMins"])
-        return df
+        try:
+            response = queryTable(supabase, tableName, genres, search, offset, limit, "CreatedAt")
+        except Exception as e:
+            if not limit or getErrorCode(e) != "42703":
+                raise
+            # Databases without the uuid_inventory_ids migration have no CreatedAt; their epoch-second IDs sort the same.
+            response = queryTable(supabase, tableName, genres, search, offset, limit, "ID")
+        return buildFrame(tableName, response.data)
     except Exception as e:
         st.error(f"Data could not be fetched from database: {e}")
         return pd.DataFrame()
 
 
+def computeStatsFallback(supabase):
+    inventoryResponse = supabase.table("Inventory").select("Genre", count="exact").execute()
+    genreSeries = pd.Series([row.get("Genre") for row in inventoryResponse.data], dtype=object).dropna()
+
+    historyResponse = supabase.table("ListeningHistory").select("DurationMins").execute()
+    durationSeries = pd.to_numeric(pd.Series([row.get("DurationMins") for row in historyResponse.data], dtype=object),
+                                   errors='coerce')
+
+    return {
+        "total_vinyls": inventoryResponse.count,
+        "favorite_genre": genreSeries.mode()[0] if not genreSeries.empty else None,
+        "total_minutes": durationSeries.sum()
+    }
+
+
+@st.cache_data(ttl=600)
+def fetchStats():
+    try:
+        supabase = initSupabase()
+        try:
+            statsRow = supabase.rpc("vinyl_stats").execute().data[0]
+        except Exception:
+            # vinyl_stats() comes from supabase/migrations; older databases without it still get their metrics.
+            statsRow = computeStatsFallback(supabase)
+
+        return {
+            "totalVinyls": int(statsRow["total_vinyls"] or 0),
+            "favoriteGenre": statsRow["favorite_genre"] or "-",
+            "totalMinutes": int(statsRow["total_minutes"] or 0)
+        }
+    except Exception as e:
+        st.error(f"Stats could not be fetched from database: {e}")
+        return {"totalVinyls": 0, "favoriteGenre": "-", "totalMinutes": 0}
+
+
+@st.cache_data(ttl=600)
+def getFacets(_inventoryDf, fetchedAt):
+    return {
+        "genres": sorted(_inventoryDf["Genre"].dropna().astype(str).unique().tolist()),
+        "artists": sorted(_inventoryDf["Artist"].dropna().astype(str).unique().tolist())
+    }
+
+
+def computeTopListenedFallback(supabase, limitCount):
+    historyResponse = supabase.table("ListeningHistory").select("AlbumName, DurationMins").execute()
+    historyDf = pd.DataFrame(historyResponse.data, columns=["AlbumName", "DurationMins"])
+    historyDf["DurationMins"] = pd.to_numeric(historyDf["DurationMins"], errors='coerce')
+
+    # Grouping listening history by album and summing durations
+    topListened = historyDf.groupby("AlbumName")["DurationMins"].sum().reset_index()
+    return topListened.sort_values(by="DurationMins", ascending=False).head(limitCount)
+
+
+@st.cache_data(ttl=600)
+def fetchTopListened(limitCount=5):
+    try:
+        supabase = initSupabase()
+        try:
+            topRows = supabase.rpc("top_listened_albums", {"limit_count": limitCount}).execute().data
+            return pd.DataFrame(topRows, columns=["AlbumName", "DurationMins"])
+        except Exception:
+            return computeTopListenedFallback(supabase, limitCount)
+    except Exception as e:
+        st.error(f"Listening history could not be fetched from database: {e}")
+        return pd.DataFrame(columns=["AlbumName", "DurationMins"])
+
+
+def clearDataCache():
+    fetchData.clear()
+    fetchStats.clear()
+    fetchTopListened.clear()
+    getFacets.clear()
+
+
+def runInventoryWrite(writeFunc, dataDict):
+    # Databases without the add_thumb_url migration reject ThumbURL, so the write is retried without it.
+    try:
+        writeFunc(dataDict)
+    except Exception as e:
+        if "ThumbURL" not in dataDict or getErrorCode(e) != "PGRST204" or "ThumbURL" not in str(e):
+            raise
+        writeFunc({key: value for key, value in dataDict.items() if key != "ThumbURL"})
+
+
 def addNewVinyl(vinylDataDict):
     supabase = initSupabase()
-    supabase.table("Inventory").insert(vinylDataDict).execute()
+    insertRow = lambda rowDict: supabase.table("Inventory").insert(rowDict).execute()
+    try:
+        runInventoryWrite(insertRow, vinylDataDict)
+    except Exception as e:
+        if getErrorCode(e) != "23502" or '"ID"' not in str(e):
+            raise
+        # Before the uuid_inventory_ids migration the ID column has no default, so the old epoch-second ID is supplied.
+        runInventoryWrite(insertRow, {**vinylDataDict, "ID": int(time.time())})
+    clearDataCache()
 
 
 def updateVinyl(vinylId, updateDataDict):
     supabase = initSupabase()
-    supabase.table("Inventory").update(updateDataDict).eq("ID", vinylId).execute()
+    runInventoryWrite(lambda rowDict: supabase.table("Inventory").update(rowDict).eq("ID", vinylId).execute(),
+                      updateDataDict)
+    clearDataCache()
 
 
 def deleteVinyl(vinylId):
     supabase = initSupabase()
     supabase.table("Inventory").delete().eq("ID", vinylId).execute()
+    clearDataCache()
 
 
 def logListeningSession(albumName, durationMinutes):
-    supabase = initSupabase()
     currentDate = datetime.now().strftime("%Y-%m-%d %H:%M")
     dataDict = {"Date": currentDate, "AlbumName": albumName, "DurationMins": durationMinutes}
-    supabase.table("ListeningHistory").insert(dataDict).execute()
+    queueWrite("ListeningHistory", dataDict)
+
+
+# --- WRITE QUEUE ---
+def queueWrite(tableName, rowDict):
+    pendingWrites = st.session_state.setdefault("pendingWrites", {})
+    pendingWrites.setdefault(tableName, []).append(rowDict)
+    st.session_state.setdefault("pendingSince", time.time())
+
+    if countPendingWrites() >= pendingWriteLimit:
+        flushWrites()
+
+
+def hasStaleWrites():
+    pendingSince = st.session_state.get("pendingSince")
+    return pendingSince is not None and time.time() - pendingSince >= pendingWriteMaxAge
+
+
+def countPendingWrites():
+    return sum(len(rows) for rows in st.session_state.get("pendingWrites", {}).values())
+
+
+def flushWrites():
+    pendingWrites = st.session_state.get("pendingWrites", {})
+    if not any(pendingWrites.values()):
+        return 0
+
+    supabase = initSupabase()
+    flushedCount = 0
+    for tableName, rows in pendingWrites.items():
+        if rows:
+            supabase.table(tableName).insert(rows).execute()
+            flushedCount += len(rows)
+            pendingWrites[tableName] = []
+
+    st.session_state.pop("pendingSince", None)
+    clearDataCache()
+    return flushedCount
 
 
 def isDuplicate(artistName, albumName, existingDataDf):
     if existingDataDf.empty:
         return False
 
-    targetArtist = str(artistName).strip().lower()
-    targetAlbum = str(albumName).strip().lower()
-
-    match = existingDataDf[
-        (existingDataDf['Artist'].astype(str).str.strip().str.lower() == targetArtist) &
-        (existingDataDf['AlbumName'].astype(str).str.strip().str.lower() == targetAlbum)
-        ]
-
-    return not match.empty
+    targetKey = f"{str(artistName).strip().lower()}\x1f{str(albumName).strip().lower()}"
+    return bool((existingDataDf["_matchKey"] == targetKey).any())
 
 
 # --- SIDEBAR & REFRESH ---
 with st.sidebar:
     st.header("Settings")
     if st.button("🔄 Refresh Data"):
+        flushWrites()
         st.cache_data.clear()
         st.rerun()
 
+    # Filled at the end of the script so the count includes sessions queued during this run.
+    syncSlot = st.empty()
+
+# Queued sessions only live in this browser session, so anything older than pendingWriteMaxAge is saved now.
+if hasStaleWrites():
+    flushWrites()
+
 # --- USER INTERFACE (UI) ---
 st.title("🎵 Vinyl Collection")
 
 vinylData = fetchData("Inventory")
-historyData = fetchData("ListeningHistory")
+if not vinylData.empty:
+    facetData = getFacets(vinylData, vinylData.attrs.get("fetchedAt"))
+else:
+    facetData = {"genres": [], "artists": []}
 
 # --- TOP PANEL (METRICS) ---
 if not vinylData.empty:
+    statsData = fetchStats()
     col1, col2, col3 = st.columns(3)
-    col1.metric("Total Vinyls", len(vinylData))
-    col2.metric("Favorite Genre", vinylData['Genre'].mode()[0] if not vinylData.empty else "-")
+    col1.metric("Total Vinyls", statsData["totalVinyls"])
+    col2.metric("Favorite Genre", statsData["favoriteGenre"])
 
-    try:
-        if not historyData.empty:
-            totalMinutes = pd.to_numeric(historyData["DurationMins"], errors='coerce').sum()
-            totalHours = int(totalMinutes // 60)
-            remainingMinutes = int(totalMinutes % 60)
+    totalHours = statsData["totalMinutes"] // 60
+    remainingMinutes = statsData["totalMinutes"] % 60
 
-            if totalHours > 0:
-                displayTime = f"{totalHours}h {remainingMinutes}m"
-            else:
-                displayTime = f"{remainingMinutes} Mins"
+    if totalHours > 0:
+        displayTime = f"{totalHours}h {remainingMinutes}m"
+    else:
+        displayTime = f"{remainingMinutes} Mins"
 
-            col3.metric("Total Listening Time", displayTime)
-        else:
-            col3.metric("Total Listening Time", "0 Mins")
-    except:
-        col3.metric("Total Listening Time", "0 Mins")
+    col3.metric("Total Listening Time", displayTime)
 
 st.divider()
 
@@ -284,69 +562,57 @@ with tabGallery:
     with colFilter:
         with st.expander("🔍 Filter Options", expanded=False):
             c1, c2 = st.columns(2)
-            selectedGenres = c1.multiselect("Select Genre", vinylData["Genre"].unique() if not vinylData.empty else [])
+            selectedGenres = c1.multiselect("Select Genre", facetData["genres"])
             searchQuery = c2.text_input("Search Album or Artist")
 
     with colToggle:
-        layoutMode = st.radio("View Layout", ["Grid View", "List View"], horizontal=True)
-
-    filteredData = vinylData.copy()
-    if not filteredData.empty:
-        if selectedGenres:
-            filteredData = filteredData[filteredData["Genre"].isin(selectedGenres)]
-        if searchQuery:
-            filteredData = filteredData[
-                filteredData["AlbumName"].str.contains(searchQuery, case=False) |
-                filteredData["Artist"].str.contains(searchQuery, case=False)
-                ]
-
-        filteredData = filteredData.sort_values(by="ID", ascending=False)
+        layoutMode = st.radio("View Layout", ["Grid View", "List View", "Table View"], horizontal=True)
+
+    filterKey = (tuple(selectedGenres), searchQuery.strip())
+    if st.session_state.get("galleryFilterKey") != filterKey:
+        st.session_state["galleryFilterKey"] = filterKey
+        st.session_state["galleryPage"] = 0
+
+    pageFrames = [
+        fetchData("Inventory", genres=filterKey[0], search=filterKey[1] or None, offset=page * galleryPageSize,
+                  limit=galleryPageSize)
+        for page in range(st.session_state["galleryPage"] + 1)
+    ]
+    hasMorePages = len(pageFrames[-1]) == galleryPageSize
+    if len(pageFrames) == 1:
+        filteredData = pageFrames[0]
+    else:
+        filteredData = pd.concat(pageFrames, ignore_index=True).drop_duplicates(subset="ID")
 
     st.write("---")
 
     if not filteredData.empty:
         if layoutMode == "Grid View":
             colsPerRow = 3
-            gridRows = [st.columns(colsPerRow) for _ in range((len(filteredData) // colsPerRow) + 1)]
+            gridCols = None
+            galleryRows = filteredData.to_dict("records")
 
-            for index, (idx, row) in enumerate(filteredData.iterrows()):
-                rowIndex = index // colsPerRow
-                colIndex = index % colsPerRow
+            # All cards go out as one markdown element; only the listen buttons stay real widgets.
+            cardsHtml = "".join(buildCardHtml(row) for row in galleryRows)
+            st.markdown(f"<div class='vinyl-grid'>{cardsHtml}</div>", unsafe_allow_html=True)
 
-                with gridRows[rowIndex][colIndex]:
-                    coverUrl = row.get("CoverURL", "")
-                    if coverUrl and str(coverUrl).startswith("http"):
-                        st.image(coverUrl, width=gridImageWidth)
-                    else:
-                        st.image("https://upload.wikimedia.org/wikipedia/commons/b/b6/12in-Vinyl-LP-Record-Angle.jpg",
-                                 width=gridImageWidth)
-
-                    st.subheader(row["AlbumName"])
-                    st.caption(f"🎤 {row['Artist']}")
+            for index, row in enumerate(galleryRows):
+                colIndex = index % colsPerRow
+                if colIndex == 0:
+                    gridCols = st.columns(colsPerRow)
 
+                with gridCols[colIndex]:
                     displayDuration = row.get("DurationMins", 0)
-                    durationStr = f" | ⏱️ {displayDuration} mins" if displayDuration else ""
-
-                    subGenreStr = f" ({row.get('SubGenre', '')})" if pd.notna(row.get('SubGenre')) and row.get(
-                        'SubGenre') else ""
-
-                    st.write(f"📅 {row['Year']} | 🏷️ {row['Genre']}{subGenreStr}{durationStr}")
-
-                    if st.button("I Listened to This", key=f"btnGrid_{row['ID']}"):
+                    if st.button(f"🎧 Listened: {row['AlbumName']}", key=f"btnGrid_{row['ID']}"):
                         logListeningSession(row["AlbumName"], displayDuration if displayDuration else 45)
-                        st.toast(f"Added {row['AlbumName']} to history!")
+                        st.toast(f"Queued {row['AlbumName']} for your listening history!")
 
         elif layoutMode == "List View":
-            for idx, row in filteredData.iterrows():
+            for row in filteredData.to_dict("records"):
                 colImg, colDetails = st.columns([1, 4])
 
                 with colImg:
-                    coverUrl = row.get("CoverURL", "")
-                    if coverUrl and str(coverUrl).startswith("http"):
-                        st.image(coverUrl, width=listImageWidth)
-                    else:
-                        st.image("https://upload.wikimedia.org/wikipedia/commons/b/b6/12in-Vinyl-LP-Record-Angle.jpg",
-                                 width=listImageWidth)
+                    st.markdown(lazyImg(row.get("CoverURL", ""), listImageWidth), unsafe_allow_html=True)
 
                 with colDetails:
                     st.header(row["AlbumName"])
@@ -374,10 +640,35 @@ with tabGallery:
 
                     if st.button("I Listened to This", key=f"btnList_{row['ID']}"):
                         logListeningSession(row["AlbumName"], displayDuration if displayDuration else 45)
-                        st.toast(f"Added {row['AlbumName']} to history!")
+                        st.toast(f"Queued {row['AlbumName']} for your listening history!")
 
                 st.write("---")
 
+        elif layoutMode == "Table View":
+            # st.dataframe ships the frame as one Arrow payload instead of several elements per vinyl.
+            emptyUrls = pd.Series("", index=filteredData.index)
+            thumbUrls = filteredData.get("ThumbURL", emptyUrls).fillna("").astype(str)
+            coverUrls = filteredData.get("CoverURL", emptyUrls).fillna("").astype(str)
+            cellUrls = thumbUrls.where(thumbUrls.str.startswith("http"), coverUrls)
+            cellUrls = cellUrls.where(cellUrls.str.startswith("http"), defaultCoverUrl)
+            tableData = filteredData[["Artist", "AlbumName", "Year", "Genre", "Condition", "DurationMins"]].assign(
+                Cover=cellUrls)
+            st.dataframe(
+                tableData,
+                column_order=["Cover", "Artist", "AlbumName", "Year", "Genre", "Condition", "DurationMins"],
+                column_config={
+                    "Cover": st.column_config.ImageColumn("Cover"),
+                    "AlbumName": "Album",
+                    "DurationMins": st.column_config.NumberColumn("Duration (Mins)")
+                },
+                use_container_width=True,
+                hide_index=True
+            )
+
+        if hasMorePages and st.button("⬇️ Load More", key="btnLoadMore", use_container_width=True):
+            st.session_state["galleryPage"] += 1
+            st.rerun()
+
 # TAB 2: ADD NEW VINYL
 with tabAdd:
     st.header("Add New Vinyl")
@@ -393,6 +684,7 @@ with tabAdd:
             if apiSearchInput:
                 with st.spinner("Searching Discogs..."):
                     st.session_state["apiResults"] = searchDiscogsApi(searchQuery=apiSearchInput)
+                    prefetchReleaseDetails(st.session_state["apiResults"])
             else:
                 st.warning("Please enter a search term.")
 
@@ -417,6 +709,7 @@ with tabAdd:
 
                         with st.spinner("Searching Discogs for barcode..."):
                             st.session_state["apiResults"] = searchDiscogsApi(barcodeQuery=scannedBarcode)
+                            prefetchReleaseDetails(st.session_state["apiResults"])
                     else:
                         st.error("No barcode detected. Please ensure the lines are perfectly in focus and try again.")
                 except Exception as e:
@@ -443,9 +736,7 @@ with tabAdd:
                     st.error(
                         f"⚠️ **Wait!** '{inputAlbum}' by '{inputArtist}' is already in your collection. It was not added.")
                 else:
-                    generatedId = int(time.time())
                     newVinylDict = {
-                        "ID": generatedId,
                         "Artist": inputArtist,
                         "AlbumName": inputAlbum,
                         "Genre": inputGenre,
@@ -480,22 +771,9 @@ with tabAdd:
 
                 if f"details_{releaseId}" not in st.session_state:
                     with st.spinner("Fetching data from Discogs and Spotify..."):
-                        tempTitle = selectedData.get("title", "Unknown - Unknown")
-                        if " - " in tempTitle:
-                            tempArtist, tempAlbum = tempTitle.split(" - ", 1)
-                        else:
-                            tempArtist, tempAlbum = "Unknown", tempTitle
-
-                        discogsDur, fetchedTracklist, fetchedSubGenre = fetchReleaseDetails(releaseId)
-                        spotifyCover, spotifyDur = fetchSpotifyData(tempArtist, tempAlbum)
-                        finalDur = spotifyDur if spotifyDur > 0 else discogsDur
-
-                        st.session_state[f"details_{releaseId}"] = {
-                            "tracklist": fetchedTracklist,
-                            "duration": finalDur,
-                            "spotifyCover": spotifyCover,
-                            "subGenre": fetchedSubGenre
-                        }
+                        detailFuture = st.session_state.get("detailFutures", {}).pop(releaseId, None)
+                        st.session_state[f"details_{releaseId}"] = loadReleaseDetails(
+                            releaseId, selectedData.get("title", "Unknown - Unknown"), detailFuture)
 
                 mergedData = st.session_state[f"details_{releaseId}"]
 
@@ -550,10 +828,7 @@ with tabAdd:
                         st.error(
                             f"⚠️ **Wait!** '{finalAlbum}' by '{finalArtist}' is already in your collection. It was not added.")
                     else:
-                        generatedId = int(time.time())
-
                         newVinylDict = {
-                            "ID": generatedId,
                             "Artist": finalArtist,
                             "AlbumName": finalAlbum,
                             "Genre": finalGenre,
@@ -564,6 +839,8 @@ with tabAdd:
                             "DurationMins": finalDuration,
                             "Tracklist": finalTracklist
                         }
+                        if selectedData.get("thumb"):
+                            newVinylDict["ThumbURL"] = selectedData["thumb"]
 
                         addNewVinyl(newVinylDict)
                         st.success(f"Successfully added {finalAlbum}! Please use the Refresh button.")
@@ -575,11 +852,12 @@ with tabLog:
     st.header("Automatic Listening Entry")
 
     if not vinylData.empty:
-        selectedFilterArtist = st.selectbox("Select Artist", vinylData["Artist"].unique(), key="logArtist")
-        artistAlbumsData = vinylData[vinylData["Artist"] == selectedFilterArtist]
-        selectedFilterAlbum = st.selectbox("Select Album", artistAlbumsData["AlbumName"].unique(), key="logAlbum")
+        selectedFilterArtist = st.selectbox("Select Artist", facetData["artists"], key="logArtist")
+        artistMask = (vinylData["Artist"] == selectedFilterArtist).to_numpy()
+        albumNames = vinylData["AlbumName"].to_numpy()
+        selectedFilterAlbum = st.selectbox("Select Album", pd.unique(albumNames[artistMask]), key="logAlbum")
 
-        albumRowInfo = artistAlbumsData[artistAlbumsData["AlbumName"] == selectedFilterAlbum].iloc[0]
+        albumRowInfo = vinylData.loc[artistMask & (albumNames == selectedFilterAlbum)].iloc[0]
         albumDurationInfo = albumRowInfo.get("DurationMins", 0)
 
         if pd.isna(albumDurationInfo) or albumDurationInfo == "":
@@ -590,7 +868,7 @@ with tabLog:
         if st.button("Log Session"):
             logListeningSession(selectedFilterAlbum, int(albumDurationInfo))
             st.balloons()
-            st.success("Session logged! Enjoy the music. Use Refresh button to update stats.")
+            st.success("Session queued! Enjoy the music. Use the Sync button to save it and update stats.")
     else:
         st.warning("Your collection is currently empty. Please add a vinyl first.")
 
@@ -599,13 +877,14 @@ with tabManage:
     st.header("Manage Your Collection")
 
     if not vinylData.empty:
-        vinylOptions = [f"{row['Artist']} - {row['AlbumName']} (ID: {row['ID']})" for idx, row in vinylData.iterrows()]
+        vinylOptions = [f"{row['Artist']} - {row['AlbumName']} (ID: {row['ID']})" for row in
+                        vinylData[["Artist", "AlbumName", "ID"]].to_dict("records")]
         selectedVinylStr = st.selectbox("Select Vinyl to Edit or Delete", vinylOptions, key="manageSelect")
 
-        match = re.search(r"\(ID: (\d+)\)", selectedVinylStr)
+        match = re.search(r"\(ID: ([^)]+)\)", selectedVinylStr)
         if match:
-            selectedId = int(match.group(1))
-            targetRow = vinylData[vinylData["ID"] == selectedId].iloc[0]
+            selectedId = match.group(1)
+            targetRow = vinylData[vinylData["ID"].astype(str) == selectedId].iloc[0]
 
             st.write("---")
             colImgMng, colEditMng = st.columns([1, 3])
@@ -615,8 +894,7 @@ with tabManage:
                 if coverUrlMng and str(coverUrlMng).startswith("http"):
                     st.image(coverUrlMng, use_container_width=True)
                 else:
-                    st.image("https://upload.wikimedia.org/wikipedia/commons/b/b6/12in-Vinyl-LP-Record-Angle.jpg",
-                             use_container_width=True)
+                    st.image(defaultCoverUrl, use_container_width=True)
 
             with colEditMng:
                 updArtist = st.text_input("Artist", value=targetRow.get("Artist", ""), key=f"updArt_{selectedId}")
@@ -666,6 +944,8 @@ with tabManage:
                             "Condition": updCondition,
                             "CoverURL": updCover
                         }
+                        if updCover != targetRow.get("CoverURL", ""):
+                            updatedDataDict["ThumbURL"] = ""
                         updateVinyl(selectedId, updatedDataDict)
                         st.success("Record updated successfully! Please refresh.")
 
@@ -700,11 +980,8 @@ with tabDash:
         st.write("---")
 
         st.subheader("🎧 Most Listened Albums")
-        if not historyData.empty:
-            # Grouping listening history by album and summing durations
-            topListened = historyData.groupby("AlbumName")["DurationMins"].sum().reset_index()
-            topListened = topListened.sort_values(by="DurationMins", ascending=False).head(5)
-
+        topListened = fetchTopListened()
+        if not topListened.empty:
             # Formatting the data for better display
             topListened.columns = ['Album', 'Total Minutes Listened']
             st.dataframe(topListened, use_container_width=True, hide_index=True)
@@ -712,4 +989,15 @@ with tabDash:
             st.info("Log some listening sessions to see your top albums here!")
 
     else:
-        st.warning("Not enough data to generate analytics. Start adding vinyls to your collection!")
\ No newline at end of file
+        st.warning("Not enough data to generate analytics. Start adding vinyls to your collection!")
+
+# --- SIDEBAR SYNC ---
+pendingCount = countPendingWrites()
+with syncSlot.container():
+    if pendingCount:
+        st.caption(f"⚠️ {pendingCount} listening session(s) not saved yet. They are lost if this tab closes "
+                   f"before syncing.")
+    if st.button(f"☁️ Sync Listening Log ({pendingCount})", disabled=pendingCount == 0):
+        syncedCount = flushWrites()
+        st.toast(f"Synced {syncedCount} listening sessions!")
+        st.rerun()